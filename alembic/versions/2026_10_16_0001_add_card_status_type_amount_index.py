@@ -0,0 +1,35 @@
+"""Add composite index on card status, type and amount
+
+Revision ID: 2026_10_16_0001
+Revises: 2025_11_05_0001
+Create Date: 2026-10-16 00:00:00.000000
+
+"""
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '2026_10_16_0001'
+down_revision = '2025_11_05_0001'
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    existing_indexes = {index["name"] for index in inspector.get_indexes('card')}
+    if 'ix_card_status_type_amount' not in existing_indexes:
+        op.create_index(
+            'ix_card_status_type_amount',
+            'card',
+            ['status', 'card_type', 'amount'],
+        )
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    existing_indexes = {index["name"] for index in inspector.get_indexes('card')}
+    if 'ix_card_status_type_amount' in existing_indexes:
+        op.drop_index('ix_card_status_type_amount', table_name='card')
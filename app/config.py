@@ -14,6 +14,10 @@ class Settings(BaseSettings):
 
     bot_token: str = Field(..., env="RASID_BOT_TOKEN")
     database_url: str = Field(..., env="RASID_DATABASE_URL")
+    db_pool_size: int = Field(10, validation_alias="RASID_DB_POOL_SIZE")
+    db_max_overflow: int = Field(20, validation_alias="RASID_DB_MAX_OVERFLOW")
+    db_pool_timeout: float = Field(30, validation_alias="RASID_DB_POOL_TIMEOUT")
+    db_pool_recycle: int = Field(1800, validation_alias="RASID_DB_POOL_RECYCLE")
 
     redis_url: str | None = Field(None, env="RASID_REDIS_URL")
     log_level: Literal["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"] = Field(
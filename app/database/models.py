@@ -10,6 +10,7 @@ from sqlalchemy import (
     DateTime,
     Enum,
     ForeignKey,
+    Index,
     Integer,
     String,
     UniqueConstraint,
@@ -128,6 +129,7 @@ class Card(Base):
     __table_args__ = (
         CheckConstraint("amount > 0", name="ck_card_amount_positive"),
         UniqueConstraint("serial_number", name="uq_card_serial"),
+        Index("ix_card_status_type_amount", "status", "card_type", "amount"),
     )
 
 
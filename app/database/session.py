@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+from typing import Any
+
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 from app.config import Settings
@@ -9,7 +12,12 @@ class Database:
     """Database engine and session factory."""
 
     def __init__(self, settings: Settings) -> None:
-        self._engine = create_async_engine(settings.database_url, echo=False, future=True)
+        self._engine = create_async_engine(
+            settings.database_url,
+            echo=False,
+            future=True,
+            **_pool_options(settings),
+        )
         self._session_factory = async_sessionmaker(
             bind=self._engine,
             expire_on_commit=False,
@@ -24,4 +32,22 @@ class Database:
         return self._session_factory()
 
 
+def _pool_options(settings: Settings) -> dict[str, Any]:
+    """Queue pool sizing for server databases.
+
+    SQLite is skipped entirely: aiosqlite file databases get a ``NullPool`` and
+    in-memory ones a ``StaticPool``, and neither accepts queue-pool arguments.
+    """
+    if make_url(settings.database_url).get_backend_name() == "sqlite":
+        return {}
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": True,
+        "pool_use_lifo": True,
+    }
+
+
 __all__ = ["Database"]
@@ -3,8 +3,10 @@ from __future__ import annotations
 import contextlib
 import logging
 from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
 
+import pandas as pd
 from aiogram import F, Router
 from aiogram.filters import StateFilter
 from aiogram.fsm.context import FSMContext
@@ -909,39 +911,35 @@ async def admin_report_cards_summary(message: Message) -> None:
         )
         return
 
-    import pandas as pd
-
     df = pd.DataFrame(records)
     df["updated_at"] = pd.to_datetime(df["updated_at"], utc=True).dt.tz_convert(
         "Asia/Tehran"
     ).dt.strftime("%Y-%m-%d %H:%M")
     df["type"] = df["type"].map({"fixed": "مبلغ ثابت", "custom": "مبلغ دلخواه"})
-    df["tariff"] = df["amount"].apply(calculate_tariff)
+    df["tariff"] = calculate_tariff(df["amount"])
     df["sender"] = df["approver"].fillna(df["responsible"])
     df["sender"] = df["sender"].fillna("—")
-    df.rename(
-        columns={
-            "id": "شناسه",
-            "amount": "مبلغ",
-            "tariff": "تعرفه واقعی",
-            "type": "نوع درخواست",
-            "updated_at": "تاریخ ارسال",
-            "requester": "درخواست‌کننده",
-            "approver": "تایید‌کننده",
-            "responsible": "مسئول",
-            "sender": "ارسال‌کننده",
-        },
-        inplace=True,
-    )
+    report_columns = {
+        "id": "شناسه",
+        "amount": "مبلغ",
+        "tariff": "تعرفه واقعی",
+        "type": "نوع درخواست",
+        "updated_at": "تاریخ ارسال",
+        "requester": "درخواست‌کننده",
+        "approver": "تایید‌کننده",
+        "responsible": "مسئول",
+        "sender": "ارسال‌کننده",
+        "card_type": "نوع کارت",
+    }
+    df = df[list(report_columns)]
+    df.columns = list(report_columns.values())
 
-    total_amount = int(df["مبلغ"].sum())
-    total_tariff = int(df["تعرفه واقعی"].sum())
-    count = len(df)
+    total_amount = sum(record["amount"] for record in records)
+    total_tariff = int(df["تعرفه واقعی"].to_numpy().sum())
+    count = len(records)
     type_summary = df.groupby("نوع درخواست")["مبلغ"].sum().to_dict()
 
-    reports_dir = services.cards.media_root.parent / "reports"
-    reports_dir.mkdir(parents=True, exist_ok=True)
-    file_path = reports_dir / "consumed_cards.xlsx"
+    file_path = services.reports_dir / "consumed_cards.xlsx"
     df.to_excel(file_path, index=False)
 
     summary_lines = [
@@ -964,45 +962,32 @@ async def admin_report_user_consumption(message: Message) -> None:
     services = get_services(message)
     now = datetime.now(timezone.utc)
     start_of_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    records = await services.requests.export_consumed_requests(
+    rows = await services.requests.summarize_consumed_by_requester(
         start=start_of_month,
         end=now,
     )
-    if not records:
+    if not rows:
         await message.answer(
             "📅 در این ماه کارت مصرف‌شده‌ای ثبت نشده است.",
             reply_markup=report_selection_keyboard(),
         )
         return
 
-    import pandas as pd
-
-    df = pd.DataFrame(records)
-    df["tariff"] = df["amount"].apply(calculate_tariff)
-    grouped = (
-        df.groupby("requester")
-        .agg(تعداد=("id", "count"), مبلغ_اسمی=("amount", "sum"), تعرفه_واقعی=("tariff", "sum"))
-        .reset_index()
-        .rename(columns={"requester": "کاربر"})
-    )
-    grouped["تعداد"] = grouped["تعداد"].astype(int)
-    grouped["مبلغ_اسمی"] = grouped["مبلغ_اسمی"].astype(int)
-    grouped["تعرفه_واقعی"] = grouped["تعرفه_واقعی"].astype(int)
-
-    reports_dir = services.cards.media_root.parent / "reports"
-    reports_dir.mkdir(parents=True, exist_ok=True)
-    file_path = reports_dir / "consumed_users.xlsx"
-    grouped.to_excel(file_path, index=False)
+    file_path = services.reports_dir / "consumed_users.xlsx"
+    pd.DataFrame(
+        rows,
+        columns=["کاربر", "تعداد", "مبلغ_اسمی", "تعرفه_واقعی"],
+    ).to_excel(file_path, index=False)
 
-    total_amount = int(grouped["مبلغ_اسمی"].sum())
-    total_tariff = int(grouped["تعرفه_واقعی"].sum())
-    total_count = int(grouped["تعداد"].sum())
+    total_count = sum(row[1] for row in rows)
+    total_amount = sum(row[2] for row in rows)
+    total_tariff = sum(row[3] for row in rows)
 
     lines = ["👥 گزارش مصرف کاربران:"]
-    for idx, row in grouped.iterrows():
+    for idx, (name, count, amount, tariff) in enumerate(rows, start=1):
         lines.append(
-            f"{idx + 1}. {row['کاربر']}: تعداد {int(row['تعداد'])}, مبلغ اسمی {int(row['مبلغ_اسمی']):,} دینار، "
-            f"تعرفه واقعی {int(row['تعرفه_واقعی']):,} دینار"
+            f"{idx}. {name}: تعداد {count}, مبلغ اسمی {amount:,} دینار، "
+            f"تعرفه واقعی {tariff:,} دینار"
         )
     lines.append("")
     lines.append(f"🔢 مجموع کارت‌ها: {total_count}")
@@ -1262,28 +1247,24 @@ async def admin_list_users(message: Message) -> None:
     for block in message_blocks:
         await message.answer(block)
 
-    import pandas as pd
-
     df = pd.DataFrame(users_data)
     if "line_expiry" in df.columns:
         df["line_expiry"] = df["line_expiry"].astype(str)
     df["is_active"] = df["is_active"].map({True: "فعال", False: "غیرفعال"})
-    df.rename(
-        columns={
-            "full_name": "نام",
-            "phone": "شماره",
-            "role": "سمت",
-            "department": "بخش",
-            "line_expiry": "تاریخ اعتبار خط",
-            "manager": "مسئول",
-            "is_active": "وضعیت",
-        },
-        inplace=True,
-    )
+    report_columns = {
+        "id": "شناسه",
+        "full_name": "نام",
+        "phone": "شماره",
+        "role": "سمت",
+        "department": "بخش",
+        "line_expiry": "تاریخ اعتبار خط",
+        "manager": "مسئول",
+        "is_active": "وضعیت",
+    }
+    df = df[list(report_columns)]
+    df.columns = list(report_columns.values())
 
-    reports_dir = services.cards.media_root.parent / "reports"
-    reports_dir.mkdir(parents=True, exist_ok=True)
-    file_path = reports_dir / "users.xlsx"
+    file_path = services.reports_dir / "users.xlsx"
     df.to_excel(file_path, index=False)
 
     await message.answer_document(
@@ -1292,6 +1273,7 @@ async def admin_list_users(message: Message) -> None:
     )
 
 
+@lru_cache()
 def get_charge_amount_keyboard() -> InlineKeyboardMarkup:
     """Create a keyboard with charge amount buttons"""
     builder = InlineKeyboardBuilder()
@@ -3,6 +3,7 @@ from __future__ import annotations
 import logging
 from datetime import datetime, timezone
 
+import pandas as pd
 from aiogram import F, Router
 from aiogram.filters import StateFilter
 from aiogram.fsm.context import FSMContext
@@ -66,38 +67,34 @@ async def responsible_report_cards(message: Message) -> None:
         )
         return
 
-    import pandas as pd
-
     df = pd.DataFrame(records)
     df["updated_at"] = pd.to_datetime(df["updated_at"], utc=True).dt.tz_convert(
         "Asia/Tehran"
     ).dt.strftime("%Y-%m-%d %H:%M")
     df["type"] = df["type"].map({"fixed": "مبلغ ثابت", "custom": "مبلغ دلخواه"})
-    df["tariff"] = df["amount"].apply(calculate_tariff)
+    df["tariff"] = calculate_tariff(df["amount"])
     df["sender"] = df["approver"].fillna(df["responsible"])
     df["sender"] = df["sender"].fillna("—")
-    df.rename(
-        columns={
-            "id": "شناسه",
-            "amount": "مبلغ",
-            "tariff": "تعرفه واقعی",
-            "type": "نوع درخواست",
-            "updated_at": "تاریخ ارسال",
-            "requester": "درخواست‌کننده",
-            "responsible": "مسئول",
-            "approver": "تایید‌کننده",
-            "sender": "ارسال‌کننده",
-        },
-        inplace=True,
-    )
-
-    total_amount = int(df["مبلغ"].sum())
-    total_tariff = int(df["تعرفه واقعی"].sum())
-    count = len(df)
-
-    reports_dir = services.cards.media_root.parent / "reports"
-    reports_dir.mkdir(parents=True, exist_ok=True)
-    file_path = reports_dir / f"consumed_resp_{current_user.id}.xlsx"
+    report_columns = {
+        "id": "شناسه",
+        "amount": "مبلغ",
+        "tariff": "تعرفه واقعی",
+        "type": "نوع درخواست",
+        "updated_at": "تاریخ ارسال",
+        "requester": "درخواست‌کننده",
+        "responsible": "مسئول",
+        "approver": "تایید‌کننده",
+        "sender": "ارسال‌کننده",
+        "card_type": "نوع کارت",
+    }
+    df = df[list(report_columns)]
+    df.columns = list(report_columns.values())
+
+    total_amount = sum(record["amount"] for record in records)
+    total_tariff = int(df["تعرفه واقعی"].to_numpy().sum())
+    count = len(records)
+
+    file_path = services.reports_dir / f"consumed_resp_{current_user.id}.xlsx"
     df.to_excel(file_path, index=False)
 
     summary = (
@@ -123,46 +120,33 @@ async def responsible_report_user_consumption(message: Message) -> None:
 
     now = datetime.now(timezone.utc)
     start_of_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    records = await services.requests.export_consumed_requests(
+    rows = await services.requests.summarize_consumed_by_requester(
         responsible_id=current_user.id,
         start=start_of_month,
         end=now,
     )
-    if not records:
+    if not rows:
         await message.answer(
             "📅 در این ماه مصرفی برای زیرمجموعه شما ثبت نشده است.",
             reply_markup=report_selection_keyboard(),
         )
         return
 
-    import pandas as pd
+    file_path = services.reports_dir / f"consumed_users_resp_{current_user.id}.xlsx"
+    pd.DataFrame(
+        rows,
+        columns=["کاربر", "تعداد", "مبلغ_اسمی", "تعرفه_واقعی"],
+    ).to_excel(file_path, index=False)
 
-    df = pd.DataFrame(records)
-    df["tariff"] = df["amount"].apply(calculate_tariff)
-    grouped = (
-        df.groupby("requester")
-        .agg(تعداد=("id", "count"), مبلغ_اسمی=("amount", "sum"), تعرفه_واقعی=("tariff", "sum"))
-        .reset_index()
-        .rename(columns={"requester": "کاربر"})
-    )
-    grouped["تعداد"] = grouped["تعداد"].astype(int)
-    grouped["مبلغ_اسمی"] = grouped["مبلغ_اسمی"].astype(int)
-    grouped["تعرفه_واقعی"] = grouped["تعرفه_واقعی"].astype(int)
-
-    reports_dir = services.cards.media_root.parent / "reports"
-    reports_dir.mkdir(parents=True, exist_ok=True)
-    file_path = reports_dir / f"consumed_users_resp_{current_user.id}.xlsx"
-    grouped.to_excel(file_path, index=False)
-
-    total_amount = int(grouped["مبلغ_اسمی"].sum())
-    total_tariff = int(grouped["تعرفه_واقعی"].sum())
-    total_count = int(grouped["تعداد"].sum())
+    total_count = sum(row[1] for row in rows)
+    total_amount = sum(row[2] for row in rows)
+    total_tariff = sum(row[3] for row in rows)
 
     lines = ["👥 گزارش مصرف کاربران زیرمجموعه:"]
-    for idx, row in grouped.iterrows():
+    for idx, (name, count, amount, tariff) in enumerate(rows, start=1):
         lines.append(
-            f"{idx + 1}. {row['کاربر']}: تعداد {int(row['تعداد'])}, مبلغ اسمی {int(row['مبلغ_اسمی']):,} دینار، "
-            f"تعرفه واقعی {int(row['تعرفه_واقعی']):,} دینار"
+            f"{idx}. {name}: تعداد {count}, مبلغ اسمی {amount:,} دینار، "
+            f"تعرفه واقعی {tariff:,} دینار"
         )
     lines.append("")
     lines.append(f"🔢 مجموع کارت‌ها: {total_count}")
@@ -189,28 +173,24 @@ async def responsible_user_list(message: Message) -> None:
         await message.answer("👥 هیچ کاربری در زیرمجموعه شما ثبت نشده است.")
         return
 
-    import pandas as pd
-
     df = pd.DataFrame(users_data)
     if "line_expiry" in df.columns:
         df["line_expiry"] = df["line_expiry"].astype(str)
     df["is_active"] = df["is_active"].map({True: "فعال", False: "غیرفعال"})
-    df.rename(
-        columns={
-            "full_name": "نام",
-            "phone": "شماره",
-            "role": "سمت",
-            "department": "بخش",
-            "line_expiry": "تاریخ اعتبار خط",
-            "manager": "مسئول",
-            "is_active": "وضعیت",
-        },
-        inplace=True,
-    )
-
-    reports_dir = services.cards.media_root.parent / "reports"
-    reports_dir.mkdir(parents=True, exist_ok=True)
-    file_path = reports_dir / f"subordinates_{current_user.id}.xlsx"
+    report_columns = {
+        "id": "شناسه",
+        "full_name": "نام",
+        "phone": "شماره",
+        "role": "سمت",
+        "department": "بخش",
+        "line_expiry": "تاریخ اعتبار خط",
+        "manager": "مسئول",
+        "is_active": "وضعیت",
+    }
+    df = df[list(report_columns)]
+    df.columns = list(report_columns.values())
+
+    file_path = services.reports_dir / f"subordinates_{current_user.id}.xlsx"
     df.to_excel(file_path, index=False)
 
     await message.answer_document(
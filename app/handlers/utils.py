@@ -46,12 +46,8 @@ async def notify_inventory_threshold(
         return
 
     title = card_type_title(card_type)
-    admins = await services.users.list_admins()
+    admins = await services.users.list_notifiable_admins(exclude_id=exclude_user_id)
     for admin in admins:
-        if not admin.telegram_id:
-            continue
-        if exclude_user_id is not None and admin.id == exclude_user_id:
-            continue
         try:
             await bot.send_message(
                 admin.telegram_id,
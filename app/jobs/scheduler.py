@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from zoneinfo import ZoneInfo
 
 import pandas as pd
+import xlsxwriter
 from aiogram import Bot
 from aiogram.types import FSInputFile
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
@@ -21,20 +25,25 @@ def _previous_month_range(reference: datetime) -> tuple[datetime, datetime]:
     return start_prev, end_prev
 
 
-async def send_monthly_reports(
-    *,
-    bot: Bot,
-    services: ServiceRegistry,
+def _write_sheet(workbook: xlsxwriter.Workbook, name: str, frame: pd.DataFrame) -> None:
+    """Write ``frame`` row by row, as required by ``constant_memory`` mode."""
+
+    sheet = workbook.add_worksheet(name)
+    sheet.write_row(0, 0, list(frame.columns))
+    values = frame.astype(object).where(frame.notna(), None)
+    for row_idx, row in enumerate(values.itertuples(index=False, name=None), start=1):
+        sheet.write_row(row_idx, 0, row)
+
+
+def _build_monthly_reports(
+    records: list[dict],
     timezone_name: str,
-) -> None:
-    now = datetime.now(timezone.utc)
-    start, end = _previous_month_range(now)
-    records = await services.requests.export_consumed_requests(
-        start=start,
-        end=end,
-    )
-    if not records:
-        return
+    reports_dir: Path,
+) -> tuple[Path, Path, int, int]:
+    """Render the monthly workbooks and return their paths with the totals.
+
+    Runs in a worker process, so it must stay free of bot/database state.
+    """
 
     tz = ZoneInfo(timezone_name)
     df = pd.DataFrame(records)
@@ -44,28 +53,26 @@ async def send_monthly_reports(
     df["type"] = df["type"].map({"fixed": "مبلغ ثابت", "custom": "مبلغ دلخواه"})
     df["card_type"] = df["card_type"].map({"asia": "آسیا", "athir": "اثیر"})
     # محاسبه تعرفه واقعی
-    df["tariff"] = df["amount"].apply(calculate_tariff)
+    df["tariff"] = calculate_tariff(df["amount"])
     # اگر approver خالی بود، از responsible استفاده می‌کنیم
     df["approver"] = df["approver"].fillna(df["responsible"])
 
-    reports_dir = services.cards.media_root.parent / "reports"
-    reports_dir.mkdir(parents=True, exist_ok=True)
     summary_file = reports_dir / "monthly_summary.xlsx"
     user_file = reports_dir / "monthly_consumption.xlsx"
 
-    detail_df = df.rename(
-        columns={
-            "id": "شناسه",
-            "amount": "مبلغ اسمی",
-            "tariff": "تعرفه واقعی",
-            "type": "نوع درخواست",
-            "updated_at": "تاریخ ارسال",
-            "requester": "درخواست‌کننده",
-            "responsible": "مسئول",
-            "approver": "تایید‌کننده",
-            "card_type": "نوع کارت",
-        }
-    )
+    detail_columns = {
+        "id": "شناسه",
+        "amount": "مبلغ اسمی",
+        "tariff": "تعرفه واقعی",
+        "type": "نوع درخواست",
+        "updated_at": "تاریخ ارسال",
+        "requester": "درخواست‌کننده",
+        "responsible": "مسئول",
+        "approver": "تایید‌کننده",
+        "card_type": "نوع کارت",
+    }
+    detail_df = df[list(detail_columns)]
+    detail_df.columns = list(detail_columns.values())
 
     category_df = (
         df.groupby(["card_type", "amount"])
@@ -89,15 +96,47 @@ async def send_monthly_reports(
         .rename(columns={"requester": "کاربر"})
     )
 
-    with pd.ExcelWriter(summary_file, engine="openpyxl") as writer:
-        detail_df.to_excel(writer, sheet_name="جزئیات", index=False)
-        category_df.to_excel(writer, sheet_name="خلاصه دسته‌بندی", index=False)
+    # constant_memory flushes each row to disk as it is written, so the
+    # detail sheet never has to be held in memory as cell objects.
+    workbook = xlsxwriter.Workbook(str(summary_file), {"constant_memory": True})
+    try:
+        _write_sheet(workbook, "جزئیات", detail_df)
+        _write_sheet(workbook, "خلاصه دسته‌بندی", category_df)
+    finally:
+        workbook.close()
 
     user_df.to_excel(user_file, index=False)
 
-    total_amount = int(df["amount"].sum())
-    total_tariff = int(df["tariff"].sum())
-    total_count = int(len(df))
+    total_amount = sum(record["amount"] for record in records)
+    total_tariff = int(df["tariff"].to_numpy().sum())
+    return summary_file, user_file, total_amount, total_tariff
+
+
+async def send_monthly_reports(
+    *,
+    bot: Bot,
+    services: ServiceRegistry,
+    timezone_name: str,
+    executor: Executor | None = None,
+) -> None:
+    now = datetime.now(timezone.utc)
+    start, end = _previous_month_range(now)
+    records = await services.requests.export_consumed_requests(
+        start=start,
+        end=end,
+    )
+    if not records:
+        return
+
+    loop = asyncio.get_running_loop()
+    summary_file, user_file, total_amount, total_tariff = await loop.run_in_executor(
+        executor,
+        _build_monthly_reports,
+        records,
+        timezone_name,
+        services.reports_dir,
+    )
+    total_count = len(records)
     await services.requests.record_monthly_report(
         period_start=start,
         period_end=end,
@@ -129,17 +168,34 @@ async def send_monthly_reports(
         )
 
 
+def create_report_executor() -> ProcessPoolExecutor:
+    """Worker process for report rendering; the caller owns it and must shut it down.
+
+    Uses ``spawn`` so the child starts clean instead of forking a process that
+    already runs threads and holds the parent's logger queue and event loop.
+    """
+    return ProcessPoolExecutor(
+        max_workers=1, mp_context=multiprocessing.get_context("spawn")
+    )
+
+
 def setup_scheduler(
     *,
     bot: Bot,
     services: ServiceRegistry,
     timezone_name: str,
+    report_executor: Executor | None = None,
 ) -> AsyncIOScheduler:
     scheduler = AsyncIOScheduler(timezone=ZoneInfo(timezone_name))
     scheduler.add_job(
         send_monthly_reports,
         CronTrigger(day=1, hour=8, minute=0),
-        kwargs={"bot": bot, "services": services, "timezone_name": timezone_name},
+        kwargs={
+            "bot": bot,
+            "services": services,
+            "timezone_name": timezone_name,
+            "executor": report_executor,
+        },
         id="monthly_reports",
         replace_existing=True,
     )
@@ -1,15 +1,39 @@
 from __future__ import annotations
 
-from aiogram.types import InlineKeyboardMarkup
+from functools import lru_cache
+from typing import TYPE_CHECKING, overload
+
+from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
 from app.database import CardType
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 CARD_AMOUNTS_ASIA = (2000, 5000, 6000, 10000, 15000, 18000, 25000, 35000, 40000, 50000, 100000)
 CARD_AMOUNTS_ATHIR = (2000, 5000, 6000, 10000, 15000, 18000, 25000, 30000, 35000, 40000, 50000, 70000, 100000)
 CARD_AMOUNTS = (2000, 5000, 6000, 10000, 15000, 18000, 25000, 30000, 35000, 40000, 50000, 70000, 100000)
+# Tariff rule shared with the SQL aggregation in RequestService
+TARIFF_THRESHOLD = 15000
+TARIFF_SURCHARGE_LOW = 500
+TARIFF_SURCHARGE_HIGH = 1000
+AMOUNT_LABELS = {
+    amount: f"💰 {amount:,}"
+    for amount in {*CARD_AMOUNTS, *CARD_AMOUNTS_ASIA, *CARD_AMOUNTS_ATHIR}
+}
+
 
+@lru_cache()
+def amount_buttons(prefix: str) -> tuple[InlineKeyboardButton, ...]:
+    """Amount buttons for ``CARD_AMOUNTS`` with callback data ``{prefix}:{amount}``."""
+    return tuple(
+        InlineKeyboardButton(text=AMOUNT_LABELS[amount], callback_data=f"{prefix}:{amount}")
+        for amount in CARD_AMOUNTS
+    )
 
+
+@lru_cache()
 def card_type_keyboard() -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
     for card_type in CardType:
@@ -21,21 +45,33 @@ def card_type_keyboard() -> InlineKeyboardMarkup:
     return builder.as_markup()
 
 
+@lru_cache()
 def card_amount_keyboard() -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
-    for amount in CARD_AMOUNTS:
-        builder.button(text=f"💰 {amount:,}", callback_data=f"card_amount:{amount}")
+    builder.add(*amount_buttons("card_amount"))
     builder.adjust(3, 3, 3, 3, 1)
     return builder.as_markup()
 
 
-def calculate_tariff(amount: int) -> int:
+@overload
+def calculate_tariff(amount: int) -> int: ...
+
+
+@overload
+def calculate_tariff(amount: pd.Series) -> pd.Series: ...
+
+
+def calculate_tariff(amount: int | pd.Series) -> int | pd.Series:
     """محاسبه تعرفه واقعی کارت بر اساس مبلغ اسمی
     
     تا 15000: مبلغ + 500
     از 18000 به بعد: مبلغ + 1000
+
+    The expression is branch-free, so it also works element-wise on a
+    pandas Series or NumPy array of amounts.
     """
-    if amount <= 15000:
-        return amount + 500
-    else:
-        return amount + 1000
+    return (
+        amount
+        + TARIFF_SURCHARGE_LOW
+        + (TARIFF_SURCHARGE_HIGH - TARIFF_SURCHARGE_LOW) * (amount > TARIFF_THRESHOLD)
+    )
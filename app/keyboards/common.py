@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+from functools import lru_cache
+
 from aiogram.types import KeyboardButton, ReplyKeyboardMarkup
 from aiogram.utils.keyboard import ReplyKeyboardBuilder
 
 
+@lru_cache()
 def contact_request_keyboard() -> ReplyKeyboardMarkup:
     """Inline button prompting user to share contact."""
 
@@ -12,6 +15,7 @@ def contact_request_keyboard() -> ReplyKeyboardMarkup:
     return builder.as_markup(resize_keyboard=True, one_time_keyboard=True)
 
 
+@lru_cache()
 def admin_main_keyboard() -> ReplyKeyboardMarkup:
     builder = ReplyKeyboardBuilder()
     builder.row(
@@ -25,6 +29,7 @@ def admin_main_keyboard() -> ReplyKeyboardMarkup:
     return builder.as_markup(resize_keyboard=True)
 
 
+@lru_cache()
 def admin_cards_menu_keyboard() -> ReplyKeyboardMarkup:
     builder = ReplyKeyboardBuilder()
     builder.row(
@@ -35,6 +40,7 @@ def admin_cards_menu_keyboard() -> ReplyKeyboardMarkup:
     return builder.as_markup(resize_keyboard=True)
 
 
+@lru_cache()
 def admin_users_menu_keyboard() -> ReplyKeyboardMarkup:
     builder = ReplyKeyboardBuilder()
     builder.row(
@@ -49,6 +55,7 @@ def admin_users_menu_keyboard() -> ReplyKeyboardMarkup:
     return builder.as_markup(resize_keyboard=True)
 
 
+@lru_cache()
 def responsible_main_keyboard() -> ReplyKeyboardMarkup:
     builder = ReplyKeyboardBuilder()
     builder.row(
@@ -62,12 +69,14 @@ def responsible_main_keyboard() -> ReplyKeyboardMarkup:
     return builder.as_markup(resize_keyboard=True)
 
 
+@lru_cache()
 def user_main_keyboard() -> ReplyKeyboardMarkup:
     builder = ReplyKeyboardBuilder()
     builder.row(KeyboardButton(text="🔋 درخواست شارژ"))
     return builder.as_markup(resize_keyboard=True)
 
 
+@lru_cache()
 def skip_line_expiry_keyboard() -> ReplyKeyboardMarkup:
     builder = ReplyKeyboardBuilder()
     builder.row(KeyboardButton(text="⏭️ رد کردن تاریخ صلاحیت"))
@@ -75,6 +84,7 @@ def skip_line_expiry_keyboard() -> ReplyKeyboardMarkup:
     return builder.as_markup(resize_keyboard=True, one_time_keyboard=False)
 
 
+@lru_cache()
 def cancel_to_main_keyboard() -> ReplyKeyboardMarkup:
     """Keyboard with single button to return to main menu."""
 
@@ -83,6 +93,7 @@ def cancel_to_main_keyboard() -> ReplyKeyboardMarkup:
     return builder.as_markup(resize_keyboard=True, one_time_keyboard=False)
 
 
+@lru_cache()
 def report_selection_keyboard() -> ReplyKeyboardMarkup:
     builder = ReplyKeyboardBuilder()
     builder.row(KeyboardButton(text="📊 گزارش کارت‌ها"))
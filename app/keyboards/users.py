@@ -1,12 +1,14 @@
 from __future__ import annotations
 
-from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
-from aiogram.utils.keyboard import ReplyKeyboardBuilder, InlineKeyboardBuilder
+from functools import lru_cache
+
+from aiogram.types import InlineKeyboardMarkup
+from aiogram.utils.keyboard import InlineKeyboardBuilder
 
 from app.database import User
-from app.database import CardType
 
 
+@lru_cache()
 def user_role_keyboard() -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
     builder.button(text="👤 کاربر عادی", callback_data="user_role:user")
@@ -15,6 +17,7 @@ def user_role_keyboard() -> InlineKeyboardMarkup:
     return builder.as_markup()
 
 
+@lru_cache()
 def department_keyboard() -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
     builder.button(text="🌐 شبکه", callback_data="department:network")
@@ -24,16 +27,24 @@ def department_keyboard() -> InlineKeyboardMarkup:
 
 
 def managers_keyboard(responsibles: list[User]) -> InlineKeyboardMarkup:
+    return _managers_keyboard(
+        tuple((responsible.id, responsible.full_name) for responsible in responsibles)
+    )
+
+
+@lru_cache(maxsize=32)
+def _managers_keyboard(entries: tuple[tuple[int, str], ...]) -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
-    for responsible in responsibles:
+    for responsible_id, full_name in entries:
         builder.button(
-            text=f"👨‍💼 {responsible.full_name}",
-            callback_data=f"manager:{responsible.id}",
+            text=f"👨‍💼 {full_name}",
+            callback_data=f"manager:{responsible_id}",
         )
     builder.adjust(1)
     return builder.as_markup()
 
 
+@lru_cache()
 def line_type_keyboard() -> InlineKeyboardMarkup:
     """کیبورد انتخاب نوع خط کاربر"""
     builder = InlineKeyboardBuilder()
@@ -43,6 +54,7 @@ def line_type_keyboard() -> InlineKeyboardMarkup:
     return builder.as_markup()
 
 
+@lru_cache()
 def approval_permission_keyboard() -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
     builder.button(text="✅ بله، مجوز ارسال مستقیم دارد", callback_data="approval_permission:yes")
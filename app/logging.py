@@ -22,5 +22,8 @@ def setup_logging(level: str = "INFO") -> None:
         format="%(asctime)s %(levelname)s [%(name)s] %(message)s",
     )
     
+    structured_logger.set_level(level)
+    structured_logger.start_background()
+
     # Log the logging system initialization
     structured_logger.log("Logging system initialized", log_level=level)
@@ -1,3 +1,4 @@
+import logging
 from typing import Callable, Dict, Any, Awaitable
 from aiogram import BaseMiddleware
 from aiogram.types import TelegramObject, Update, Message, CallbackQuery
@@ -5,9 +6,42 @@ from aiogram.fsm.context import FSMContext
 
 from app.utils.logger import logger
 
+
+def _describe_update(
+    event: Message | CallbackQuery,
+    update_id: int | None,
+    user: Any,
+    from_state: str | None,
+) -> Dict[str, Any]:
+    """Build the structured payload describing an incoming update."""
+    update_data: Dict[str, Any] = {
+        "update_id": update_id,
+        "user_id": user.id if user else None,
+        "from_state": from_state,
+    }
+
+    if isinstance(event, Message):
+        update_data.update({
+            "update_type": "message",
+            "chat_id": event.chat.id,
+            "message_id": event.message_id,
+            "text": event.text,
+            "content_type": event.content_type,
+        })
+    else:
+        message = event.message
+        update_data.update({
+            "update_type": "callback_query",
+            "chat_id": message.chat.id if message else None,
+            "callback_data": event.data,
+            "message_id": message.message_id if message else None,
+        })
+    return update_data
+
+
 class LoggingMiddleware(BaseMiddleware):
     """Middleware to log all bot interactions and state changes."""
-    
+
     async def __call__(
         self,
         handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
@@ -20,67 +54,50 @@ class LoggingMiddleware(BaseMiddleware):
 
         # Extract the originating Update if available
         update: Update | None = data.get("event_update")
-        update_id = getattr(event, "update_id", None)
-        if update_id is None and update is not None:
-            update_id = getattr(update, "update_id", None)
+        update_id = update.update_id if update is not None else None
 
-        # Get user and chat info
+        # Get user info
         user = data.get("event_from_user")
-        chat = event.chat if hasattr(event, 'chat') else None
-        
+
         # Get current state
         state: FSMContext = data.get("state")
         from_state = await state.get_state() if state else None
-        
-        # Log the incoming update
-        update_type = "message" if isinstance(event, Message) else "callback_query"
-        update_data = {
-            "update_id": update_id,
-            "update_type": update_type,
-            "user_id": user.id if user else None,
-            "chat_id": chat.id if chat else None,
-            "from_state": from_state,
-        }
-        
-        if isinstance(event, Message):
-            update_data.update({
-                "message_id": event.message_id,
-                "text": event.text,
-                "content_type": event.content_type,
-            })
-        elif isinstance(event, CallbackQuery):
-            update_data.update({
-                "callback_data": event.data,
-                "message_id": event.message.message_id if event.message else None,
-            })
-        
-        logger.debug("Processing update", **{"update": update_data})
-        
+
+        # Only build the update payload when it will actually be written
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Processing update",
+                update=_describe_update(event, update_id, user, from_state),
+            )
+
+        handler_name = getattr(handler, "__qualname__", "?")
         try:
             # Process the update
             result = await handler(event, data)
-            
+
             # Log state change if it happened
             if state:
                 to_state = await state.get_state()
                 if to_state != from_state:
-                    logger.log_state_change(
+                    logger.defer(
+                        logger.log_state_change,
                         user_id=user.id if user else None,
                         from_state=from_state,
                         to_state=to_state,
                         update_id=update_id,
-                        handler=handler.__name__,
+                        handler=handler_name,
                     )
-            
+
             return result
-            
+
         except Exception as e:
             # Log any errors that occur during handling
-            logger.error(
-                f"Error in {handler.__name__}",
+            logger.defer(
+                logger.error,
+                f"Error in {handler_name}",
                 exception=e,
                 user_id=user.id if user else None,
                 from_state=from_state,
-                update=update_data,
+                update=_describe_update(event, update_id, user, from_state),
             )
             raise
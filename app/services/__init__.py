@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from pathlib import Path
 
 from app.config import Settings
 from app.database import Database
@@ -16,6 +17,7 @@ class ServiceRegistry:
     cards: CardService
     requests: RequestService
     users: UserService
+    reports_dir: Path
 
 
 def build_services(settings: Settings) -> ServiceRegistry:
@@ -23,7 +25,15 @@ def build_services(settings: Settings) -> ServiceRegistry:
     cards = CardService(database, settings.media_root)
     requests = RequestService(database)
     users = UserService(database)
-    return ServiceRegistry(database=database, cards=cards, requests=requests, users=users)
+    reports_dir = settings.media_root.parent / "reports"
+    reports_dir.mkdir(parents=True, exist_ok=True)
+    return ServiceRegistry(
+        database=database,
+        cards=cards,
+        requests=requests,
+        users=users,
+        reports_dir=reports_dir,
+    )
 
 
 __all__ = ["ServiceRegistry", "build_services"]
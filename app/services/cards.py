@@ -1,9 +1,10 @@
 from __future__ import annotations
 
-from collections import defaultdict
+import logging
 from pathlib import Path
+from typing import Sequence
 
-from sqlalchemy import func, select
+from sqlalchemy import func, insert, select, update
 from sqlalchemy.exc import NoResultFound
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -21,6 +22,8 @@ from app.utils.logger import logger
 class CardService:
     """Business logic helpers around card inventory management."""
 
+    __slots__ = ("database", "media_root")
+
     def __init__(self, database: Database, media_root: Path) -> None:
         self.database = database
         self.media_root = media_root
@@ -38,41 +41,44 @@ class CardService:
         if image_file_id is None and serial_number is None:
             raise ValueError("Either image_file_id or serial_number must be provided")
         async with self.database.session() as session:
-            card = Card(
-                card_type=card_type,
-                amount=amount,
-                image_file_id=image_file_id,
-                image_path=image_path,
-                serial_number=serial_number,
-                added_by_id=actor_id,
+            card = await session.scalar(
+                insert(Card)
+                .values(
+                    card_type=card_type,
+                    amount=amount,
+                    image_file_id=image_file_id,
+                    image_path=image_path,
+                    serial_number=serial_number,
+                    added_by_id=actor_id,
+                )
+                .returning(Card)
             )
-            session.add(card)
-            await session.flush()
             await self._log(session, card.id, InventoryAction.ADD, actor_id)
             await session.commit()
-            await session.refresh(card)
-            logger.log_card_operation(
-                operation=InventoryAction.ADD.value,
-                card_id=card.id,
-                user_id=actor_id,
-                card_type=card_type.value,
-                amount=amount,
-            )
+            if logger.isEnabledFor(logging.INFO):
+                logger.log_card_operation(
+                    operation=InventoryAction.ADD.value,
+                    card_id=card.id,
+                    user_id=actor_id,
+                    card_type=card_type.value,
+                    amount=amount,
+                )
             return card
 
     async def available_summary(self) -> dict[str, dict[int, int]]:
         async with self.database.session() as session:
             result = await session.execute(
-                select(Card.card_type, Card.amount, Card.id)
+                select(Card.card_type, Card.amount, func.count(Card.id))
                 .where(Card.status == CardStatus.AVAILABLE)
+                .group_by(Card.card_type, Card.amount)
                 .order_by(Card.card_type, Card.amount)
             )
-            summary: dict[str, dict[int, int]] = defaultdict(lambda: defaultdict(int))
-            for card_type, amount, _ in result:
-                summary[card_type.value][amount] += 1
+            summary: dict[str, dict[int, int]] = {}
+            for card_type, amount, count in result:
+                summary.setdefault(card_type.value, {})[amount] = count
             return summary
 
-    async def list_available(self, card_type: CardType, amount: int) -> list[Card]:
+    async def list_available(self, card_type: CardType, amount: int) -> Sequence[Card]:
         async with self.database.session() as session:
             result = await session.execute(
                 select(Card)
@@ -83,7 +89,7 @@ class CardService:
                 )
                 .order_by(Card.id)
             )
-            return list(result.scalars().all())
+            return result.scalars().all()
 
     async def take_first_available(
         self,
@@ -93,38 +99,44 @@ class CardService:
         actor_id: int | None,
     ) -> Card:
         async with self.database.session() as session:
-            stmt = (
-                select(Card)
+            picked = (
+                select(Card.id)
                 .where(
                     Card.card_type == card_type,
                     Card.amount == amount,
                     Card.status == CardStatus.AVAILABLE,
                 )
                 .order_by(Card.id)
+                .limit(1)
                 .with_for_update(skip_locked=True)
+                .scalar_subquery()
+            )
+            result = await session.execute(
+                update(Card)
+                .where(Card.id == picked)
+                .values(status=CardStatus.RESERVED)
+                .returning(Card)
+                .execution_options(synchronize_session=False)
             )
-            result = await session.execute(stmt)
             card = result.scalars().first()
             if card is None:
                 raise NoResultFound("هیچ کارت فعالی برای این مبلغ و نوع موجود نیست.")
-            card.status = CardStatus.RESERVED
-            await session.flush()
             await self._log(session, card.id, InventoryAction.RESERVE, actor_id)
             await session.commit()
-            await session.refresh(card)
-            logger.log_card_operation(
-                operation=InventoryAction.RESERVE.value,
-                card_id=card.id,
-                user_id=actor_id,
-                card_type=card.card_type.value,
-                amount=card.amount,
-            )
+            if logger.isEnabledFor(logging.INFO):
+                logger.log_card_operation(
+                    operation=InventoryAction.RESERVE.value,
+                    card_id=card.id,
+                    user_id=actor_id,
+                    card_type=card.card_type.value,
+                    amount=card.amount,
+                )
             return card
 
     async def count_available(self, card_type: CardType, amount: int) -> int:
         async with self.database.session() as session:
             result = await session.execute(
-                select(func.count())
+                select(func.count(Card.id))
                 .where(
                     Card.card_type == card_type,
                     Card.amount == amount,
@@ -135,59 +147,74 @@ class CardService:
 
     async def reserve_card(self, card_id: int, actor_id: int | None) -> Card:
         async with self.database.session() as session:
-            card = await session.get(Card, card_id, with_for_update=True)
-            if card is None or card.status is not CardStatus.AVAILABLE:
+            result = await session.execute(
+                update(Card)
+                .where(Card.id == card_id, Card.status == CardStatus.AVAILABLE)
+                .values(status=CardStatus.RESERVED)
+                .returning(Card)
+                .execution_options(synchronize_session=False)
+            )
+            card = result.scalars().first()
+            if card is None:
                 raise NoResultFound("Selected card is not available.")
-            card.status = CardStatus.RESERVED
-            await session.flush()
             await self._log(session, card.id, InventoryAction.RESERVE, actor_id)
             await session.commit()
-            await session.refresh(card)
-            logger.log_card_operation(
-                operation=InventoryAction.RESERVE.value,
-                card_id=card.id,
-                user_id=actor_id,
-                card_type=card.card_type.value,
-                amount=card.amount,
-            )
+            if logger.isEnabledFor(logging.INFO):
+                logger.log_card_operation(
+                    operation=InventoryAction.RESERVE.value,
+                    card_id=card.id,
+                    user_id=actor_id,
+                    card_type=card.card_type.value,
+                    amount=card.amount,
+                )
             return card
 
     async def mark_sent(self, card_id: int, actor_id: int | None) -> Card:
         async with self.database.session() as session:
-            card = await session.get(Card, card_id, with_for_update=True)
+            result = await session.execute(
+                update(Card)
+                .where(Card.id == card_id)
+                .values(status=CardStatus.SENT)
+                .returning(Card)
+                .execution_options(synchronize_session=False)
+            )
+            card = result.scalars().first()
             if card is None:
                 raise NoResultFound("Card not found.")
-            card.status = CardStatus.SENT
-            await session.flush()
             await self._log(session, card.id, InventoryAction.SEND, actor_id)
             await session.commit()
-            await session.refresh(card)
-            logger.log_card_operation(
-                operation=InventoryAction.SEND.value,
-                card_id=card.id,
-                user_id=actor_id,
-                card_type=card.card_type.value,
-                amount=card.amount,
-            )
+            if logger.isEnabledFor(logging.INFO):
+                logger.log_card_operation(
+                    operation=InventoryAction.SEND.value,
+                    card_id=card.id,
+                    user_id=actor_id,
+                    card_type=card.card_type.value,
+                    amount=card.amount,
+                )
             return card
 
     async def restore_card(self, card_id: int, actor_id: int | None) -> Card:
         async with self.database.session() as session:
-            card = await session.get(Card, card_id, with_for_update=True)
+            result = await session.execute(
+                update(Card)
+                .where(Card.id == card_id)
+                .values(status=CardStatus.AVAILABLE)
+                .returning(Card)
+                .execution_options(synchronize_session=False)
+            )
+            card = result.scalars().first()
             if card is None:
                 raise NoResultFound("Card not found.")
-            card.status = CardStatus.AVAILABLE
-            await session.flush()
             await self._log(session, card.id, InventoryAction.RESTORE, actor_id)
             await session.commit()
-            await session.refresh(card)
-            logger.log_card_operation(
-                operation=InventoryAction.RESTORE.value,
-                card_id=card.id,
-                user_id=actor_id,
-                card_type=card.card_type.value,
-                amount=card.amount,
-            )
+            if logger.isEnabledFor(logging.INFO):
+                logger.log_card_operation(
+                    operation=InventoryAction.RESTORE.value,
+                    card_id=card.id,
+                    user_id=actor_id,
+                    card_type=card.card_type.value,
+                    amount=card.amount,
+                )
             return card
 
     async def _log(
@@ -198,10 +225,11 @@ class CardService:
         actor_id: int | None,
         note: str | None = None,
     ) -> None:
-        log = CardInventoryLog(
-            card_id=card_id,
-            action=action,
-            actor_id=actor_id,
-            note=note,
+        await session.execute(
+            insert(CardInventoryLog).values(
+                card_id=card_id,
+                action=action,
+                actor_id=actor_id,
+                note=note,
+            )
         )
-        session.add(log)
@@ -1,15 +1,20 @@
 from __future__ import annotations
 
+import logging
 from datetime import datetime, timezone
 from typing import Iterable
 
-from sqlalchemy import select
+from sqlalchemy import Select, case, func, insert, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.exc import NoResultFound
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import aliased
+from sqlalchemy.orm.attributes import set_committed_value
 
 from app.database import (
     Card,
+    CardType,
     Database,
     MonthlyReport,
     RechargeRequest,
@@ -18,12 +23,44 @@ from app.database import (
     RequestType,
     User,
 )
+from app.keyboards.cards import (
+    TARIFF_SURCHARGE_HIGH,
+    TARIFF_SURCHARGE_LOW,
+    TARIFF_THRESHOLD,
+)
 from app.utils.logger import logger
 
+# Dialect-specific INSERT constructs that support ON CONFLICT DO UPDATE.
+_UPSERT_INSERTS = {"postgresql": pg_insert, "sqlite": sqlite_insert}
+
+
+def _consumed_record(
+    request_id: int,
+    amount: int,
+    request_type: RequestType,
+    updated_at: datetime,
+    requester: str,
+    responsible: str | None,
+    approver: str | None,
+    card_type: CardType | None,
+) -> dict:
+    return {
+        "id": request_id,
+        "amount": amount,
+        "type": request_type.value,
+        "updated_at": updated_at,
+        "requester": requester,
+        "responsible": responsible,
+        "approver": approver,
+        "card_type": card_type.value if card_type else None,
+    }
+
 
 class RequestService:
     """Encapsulate core recharge request workflow operations."""
 
+    __slots__ = ("database",)
+
     def __init__(self, database: Database) -> None:
         self.database = database
 
@@ -39,16 +76,18 @@ class RequestService:
         card_type: str | None = None,
     ) -> RechargeRequest:
         async with self.database.session() as session:
-            request = RechargeRequest(
-                requester_id=requester_id,
-                responsible_id=responsible_id,
-                amount=amount,
-                request_type=request_type,
-                status=status,
-                card_type=card_type,
+            request = await session.scalar(
+                insert(RechargeRequest)
+                .values(
+                    requester_id=requester_id,
+                    responsible_id=responsible_id,
+                    amount=amount,
+                    request_type=request_type,
+                    status=status,
+                    card_type=card_type,
+                )
+                .returning(RechargeRequest)
             )
-            session.add(request)
-            await session.flush()
             await self._log(
                 session,
                 request_id=request.id,
@@ -57,16 +96,16 @@ class RequestService:
                 note=note,
             )
             await session.commit()
-            await session.refresh(request)
-            logger.log(
-                "Recharge request created",
-                request_id=request.id,
-                requester_id=requester_id,
-                responsible_id=responsible_id,
-                amount=amount,
-                request_type=request_type.value,
-                status=status.value,
-            )
+            if logger.isEnabledFor(logging.INFO):
+                logger.log(
+                    "Recharge request created",
+                    request_id=request.id,
+                    requester_id=requester_id,
+                    responsible_id=responsible_id,
+                    amount=amount,
+                    request_type=request_type.value,
+                    status=status.value,
+                )
             return request
 
     async def set_status(
@@ -84,9 +123,22 @@ class RequestService:
             if request is None:
                 raise NoResultFound("Request not found.")
             previous_status = request.status
-            request.status = new_status
-            request.updated_at = datetime.now(timezone.utc)
-            await session.flush()
+            # Let PostgreSQL stamp updated_at so every bot instance shares one clock. SQLite
+            # keeps the client-side stamp: CURRENT_TIMESTAMP drops the microseconds the
+            # DateTime type writes everywhere else, and SQLite compares the column as text.
+            if self.database.engine.dialect.name == "sqlite":
+                updated_at = datetime.now(timezone.utc)
+            else:
+                updated_at = func.now()
+            result = await session.execute(
+                update(RechargeRequest)
+                .where(RechargeRequest.id == request_id)
+                .values(status=new_status, updated_at=updated_at)
+                .returning(RechargeRequest.updated_at)
+                .execution_options(synchronize_session=False)
+            )
+            set_committed_value(request, "status", new_status)
+            set_committed_value(request, "updated_at", result.scalar_one())
             await self._log(
                 session,
                 request_id=request.id,
@@ -96,15 +148,15 @@ class RequestService:
                 note=note,
             )
             await session.commit()
-            await session.refresh(request)
-            logger.log(
-                "Recharge request status updated",
-                request_id=request.id,
-                actor_id=actor_id,
-                from_status=previous_status.value if previous_status else None,
-                to_status=new_status.value,
-                note=note,
-            )
+            if logger.isEnabledFor(logging.INFO):
+                logger.log(
+                    "Recharge request status updated",
+                    request_id=request.id,
+                    actor_id=actor_id,
+                    from_status=previous_status.value if previous_status else None,
+                    to_status=new_status.value,
+                    note=note,
+                )
             return request
 
     async def get_request(self, request_id: int) -> RechargeRequest | None:
@@ -118,57 +170,48 @@ class RequestService:
         start: datetime | None = None,
         end: datetime | None = None,
     ) -> list[dict]:
+        stmt = self._consumed_requests_stmt(
+            responsible_id=responsible_id, start=start, end=end
+        )
+        async with self.database.session() as session:
+            result = await session.execute(stmt)
+            return [_consumed_record(*row) for row in result.tuples()]
+
+    async def summarize_consumed_by_requester(
+        self,
+        *,
+        responsible_id: int | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> list[tuple[str, int, int, int]]:
+        """Return ``(requester, count, amount, tariff)`` totals per requester."""
         async with self.database.session() as session:
             requester_alias = aliased(User)
-            responsible_alias = aliased(User)
-            approver_alias = aliased(User)
+            # Same rule as app.keyboards.cards.calculate_tariff.
+            tariff = RechargeRequest.amount + case(
+                (RechargeRequest.amount <= TARIFF_THRESHOLD, TARIFF_SURCHARGE_LOW),
+                else_=TARIFF_SURCHARGE_HIGH,
+            )
             stmt = (
                 select(
-                    RechargeRequest.id,
-                    RechargeRequest.amount,
-                    RechargeRequest.request_type,
-                    RechargeRequest.updated_at,
-                    requester_alias.full_name.label("requester_name"),
-                    responsible_alias.full_name.label("responsible_name"),
-                    approver_alias.full_name.label("approver_name"),
-                    Card.card_type,
+                    requester_alias.full_name,
+                    func.count(RechargeRequest.id),
+                    func.sum(RechargeRequest.amount),
+                    func.sum(tariff),
                 )
                 .join(requester_alias, RechargeRequest.requester_id == requester_alias.id)
-                .outerjoin(
-                    responsible_alias,
-                    RechargeRequest.responsible_id == responsible_alias.id,
-                )
-                .outerjoin(
-                    approver_alias,
-                    RechargeRequest.approver_id == approver_alias.id,
-                )
-                .outerjoin(Card, RechargeRequest.final_card_id == Card.id)
                 .where(RechargeRequest.status == RequestStatus.APPROVED)
+                .group_by(requester_alias.full_name)
+            )
+            stmt = self._filter_consumed(
+                stmt, responsible_id=responsible_id, start=start, end=end
             )
-            if responsible_id is not None:
-                stmt = stmt.where(RechargeRequest.responsible_id == responsible_id)
-            if start is not None:
-                stmt = stmt.where(RechargeRequest.updated_at >= start)
-            if end is not None:
-                stmt = stmt.where(RechargeRequest.updated_at <= end)
 
-            result = await session.execute(stmt.order_by(RechargeRequest.updated_at))
-            rows = result.all()
-            data: list[dict] = []
-            for row in rows:
-                data.append(
-                    {
-                        "id": row.id,
-                        "amount": row.amount,
-                        "type": row.request_type.value,
-                        "updated_at": row.updated_at,
-                        "requester": row.requester_name,
-                        "responsible": row.responsible_name,
-                        "approver": row.approver_name,
-                        "card_type": row.card_type.value if row.card_type else None,
-                    }
-                )
-            return data
+            result = await session.execute(stmt.order_by(requester_alias.full_name))
+            return [
+                (name, count, int(amount), int(tariff_total))
+                for name, count, amount, tariff_total in result.all()
+            ]
 
     async def attach_card(
         self,
@@ -184,7 +227,6 @@ class RequestService:
             if request is None:
                 raise NoResultFound("Request not found.")
             request.final_card_id = card_id
-            await session.flush()
             await self._log(
                 session,
                 request_id=request.id,
@@ -194,13 +236,13 @@ class RequestService:
                 note="Card assigned",
             )
             await session.commit()
-            await session.refresh(request)
-            logger.log(
-                "Recharge request card attached",
-                request_id=request.id,
-                card_id=card_id,
-                actor_id=actor_id,
-            )
+            if logger.isEnabledFor(logging.INFO):
+                logger.log(
+                    "Recharge request card attached",
+                    request_id=request.id,
+                    card_id=card_id,
+                    actor_id=actor_id,
+                )
             return request
 
     async def set_approver(
@@ -217,12 +259,12 @@ class RequestService:
                 raise NoResultFound("Request not found.")
             request.approver_id = approver_id
             await session.commit()
-            await session.refresh(request)
-            logger.log(
-                "Recharge request approver set",
-                request_id=request.id,
-                approver_id=approver_id,
-            )
+            if logger.isEnabledFor(logging.INFO):
+                logger.log(
+                    "Recharge request approver set",
+                    request_id=request.id,
+                    approver_id=approver_id,
+                )
             return request
 
     async def record_monthly_report(
@@ -233,36 +275,90 @@ class RequestService:
         total_amount: int,
         report_path: str,
     ) -> MonthlyReport:
+        dialect = self.database.engine.dialect.name
+        upsert = _UPSERT_INSERTS[dialect](MonthlyReport).values(
+            period_start=period_start.date(),
+            period_end=period_end.date(),
+            total_amount=total_amount,
+            report_path=report_path,
+        )
+        stmt = upsert.on_conflict_do_update(
+            index_elements=[MonthlyReport.period_start, MonthlyReport.period_end],
+            set_={
+                "total_amount": upsert.excluded.total_amount,
+                "report_path": upsert.excluded.report_path,
+            },
+        ).returning(MonthlyReport)
         async with self.database.session() as session:
-            stmt = select(MonthlyReport).where(
-                MonthlyReport.period_start == period_start.date(),
-                MonthlyReport.period_end == period_end.date(),
-            )
             result = await session.execute(stmt)
-            report = result.scalars().first()
-            if report:
-                report.total_amount = total_amount
-                report.report_path = report_path
-            else:
-                report = MonthlyReport(
-                    period_start=period_start.date(),
-                    period_end=period_end.date(),
+            report = result.scalar_one()
+            await session.commit()
+            if logger.isEnabledFor(logging.INFO):
+                logger.log(
+                    "Monthly report recorded",
+                    report_id=report.id,
+                    period_start=str(period_start.date()),
+                    period_end=str(period_end.date()),
                     total_amount=total_amount,
                     report_path=report_path,
                 )
-                session.add(report)
-            await session.commit()
-            await session.refresh(report)
-            logger.log(
-                "Monthly report recorded",
-                report_id=report.id,
-                period_start=str(period_start.date()),
-                period_end=str(period_end.date()),
-                total_amount=total_amount,
-                report_path=report_path,
-            )
             return report
 
+    @classmethod
+    def _consumed_requests_stmt(
+        cls,
+        *,
+        responsible_id: int | None,
+        start: datetime | None,
+        end: datetime | None,
+    ) -> Select:
+        requester_alias = aliased(User)
+        responsible_alias = aliased(User)
+        approver_alias = aliased(User)
+        stmt = (
+            select(
+                RechargeRequest.id,
+                RechargeRequest.amount,
+                RechargeRequest.request_type,
+                RechargeRequest.updated_at,
+                requester_alias.full_name.label("requester_name"),
+                responsible_alias.full_name.label("responsible_name"),
+                approver_alias.full_name.label("approver_name"),
+                Card.card_type,
+            )
+            .join(requester_alias, RechargeRequest.requester_id == requester_alias.id)
+            .outerjoin(
+                responsible_alias,
+                RechargeRequest.responsible_id == responsible_alias.id,
+            )
+            .outerjoin(
+                approver_alias,
+                RechargeRequest.approver_id == approver_alias.id,
+            )
+            .outerjoin(Card, RechargeRequest.final_card_id == Card.id)
+            .where(RechargeRequest.status == RequestStatus.APPROVED)
+        )
+        stmt = cls._filter_consumed(
+            stmt, responsible_id=responsible_id, start=start, end=end
+        )
+        return stmt.order_by(RechargeRequest.updated_at)
+
+    @staticmethod
+    def _filter_consumed(
+        stmt: Select,
+        *,
+        responsible_id: int | None,
+        start: datetime | None,
+        end: datetime | None,
+    ) -> Select:
+        if responsible_id is not None:
+            stmt = stmt.where(RechargeRequest.responsible_id == responsible_id)
+        if start is not None:
+            stmt = stmt.where(RechargeRequest.updated_at >= start)
+        if end is not None:
+            stmt = stmt.where(RechargeRequest.updated_at <= end)
+        return stmt
+
     async def _log(
         self,
         session: AsyncSession,
@@ -273,11 +369,12 @@ class RequestService:
         from_status: RequestStatus | None = None,
         note: str | None = None,
     ) -> None:
-        history = RequestStatusHistory(
-            request_id=request_id,
-            actor_id=actor_id,
-            from_status=from_status,
-            to_status=to_status,
-            note=note,
+        await session.execute(
+            insert(RequestStatusHistory).values(
+                request_id=request_id,
+                actor_id=actor_id,
+                from_status=from_status,
+                to_status=to_status,
+                note=note,
+            )
         )
-        session.add(history)
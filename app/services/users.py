@@ -1,9 +1,10 @@
 from __future__ import annotations
 
+import time
 from datetime import date
-from typing import Iterable
+from typing import Any, Hashable, Iterable
 
-from sqlalchemy import select
+from sqlalchemy import bindparam, select, update
 from sqlalchemy.exc import NoResultFound
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import aliased
@@ -12,29 +13,80 @@ from app.database import Department, Database, User, UserRole, CardType
 from app.utils.logger import logger
 
 
+# Built once so per-update lookups reuse the same statement (and its compiled-cache entry)
+_USER_BY_PHONE = select(User).where(User.phone == bindparam("phone"))
+_USER_BY_TELEGRAM_ID = select(User).where(
+    User.telegram_id == bindparam("telegram_id"),
+    User.is_active.is_(True),
+)
+
+
+class _TTLCache:
+    """Small size-bounded cache whose entries expire ``ttl`` seconds after being stored."""
+
+    __slots__ = ("ttl", "maxsize", "_entries")
+
+    def __init__(self, *, ttl: float, maxsize: int) -> None:
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: dict[Hashable, tuple[float, Any]] = {}
+
+    def get(self, key: Hashable) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+        return entry[1]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        self._entries.pop(key, None)
+        if len(self._entries) >= self.maxsize:
+            del self._entries[next(iter(self._entries))]
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
 class UserService:
     """Data access helpers for working with users."""
 
+    __slots__ = ("database", "_list_cache", "_telegram_cache", "_cache_generation")
+
     def __init__(self, database: Database) -> None:
         self.database = database
+        # Short-lived cache for user lists, so menus rendered back to back share one query
+        self._list_cache = _TTLCache(ttl=5.0, maxsize=64)
+        # Every update resolves its sender, and accounts rarely change between updates
+        self._telegram_cache = _TTLCache(ttl=30.0, maxsize=4096)
+        # Bumped on every invalidation; a query that straddles one must not refill the caches
+        self._cache_generation = 0
+
+    def _invalidate_caches(self) -> None:
+        self._cache_generation += 1
+        self._list_cache.clear()
+        self._telegram_cache.clear()
 
     async def get_by_phone(self, phone: str) -> User | None:
         async with self.database.session() as session:
             return await self._get_by_phone(session, phone)
 
     async def _get_by_phone(self, session: AsyncSession, phone: str) -> User | None:
-        result = await session.execute(select(User).where(User.phone == phone))
+        result = await session.execute(_USER_BY_PHONE, {"phone": phone})
         return result.scalars().first()
 
     async def get_by_telegram_id(self, telegram_id: int) -> User | None:
+        cached = self._telegram_cache.get(telegram_id)
+        if cached is not None:
+            return cached
+        generation = self._cache_generation
         async with self.database.session() as session:
             result = await session.execute(
-                select(User).where(
-                    User.telegram_id == telegram_id,
-                    User.is_active.is_(True),
-                )
+                _USER_BY_TELEGRAM_ID, {"telegram_id": telegram_id}
             )
-            return result.scalars().first()
+            user = result.scalars().first()
+        if user is not None and generation == self._cache_generation:
+            self._telegram_cache.put(telegram_id, user)
+        return user
 
     async def get_by_id(self, user_id: int) -> User | None:
         async with self.database.session() as session:
@@ -49,7 +101,7 @@ class UserService:
                 raise NoResultFound(f"User id={user.id} not found")
             db_user.telegram_id = telegram_id
             await session.commit()
-            await session.refresh(db_user)
+            self._invalidate_caches()
             logger.log(
                 "User telegram attached",
                 user_id=db_user.id,
@@ -58,35 +110,55 @@ class UserService:
             return db_user
 
     async def list_responsibles(self) -> list[User]:
-        async with self.database.session() as session:
-            result = await session.execute(
-                select(User).where(
-                    User.role == UserRole.RESPONSIBLE,
-                    User.is_active.is_(True),
-                )
-            )
-            return list(result.scalars().all())
+        return await self._query_users(role=UserRole.RESPONSIBLE)
 
     async def list_members(self, manager_id: int) -> list[User]:
-        async with self.database.session() as session:
-            result = await session.execute(
-                select(User).where(User.manager_id == manager_id)
-            )
-            return list(result.scalars().all())
+        return await self._query_users(manager_id=manager_id, active_only=False)
 
     async def list_users(self) -> list[User]:
-        async with self.database.session() as session:
-            result = await session.execute(select(User))
-            return list(result.scalars().all())
+        return await self._query_users(active_only=False)
 
     async def list_admins(self) -> list[User]:
+        return await self._query_users(role=UserRole.ADMIN)
+
+    async def _query_users(
+        self,
+        *,
+        role: UserRole | None = None,
+        manager_id: int | None = None,
+        active_only: bool = True,
+    ) -> list[User]:
+        key = (role, manager_id, active_only)
+        cached = self._list_cache.get(key)
+        if cached is not None:
+            return list(cached)
+
+        stmt = select(User)
+        if role is not None:
+            stmt = stmt.where(User.role == role)
+        if manager_id is not None:
+            stmt = stmt.where(User.manager_id == manager_id)
+        if active_only:
+            stmt = stmt.where(User.is_active.is_(True))
+        generation = self._cache_generation
         async with self.database.session() as session:
-            result = await session.execute(
-                select(User).where(
-                    User.role == UserRole.ADMIN,
-                    User.is_active.is_(True),
-                )
+            result = await session.execute(stmt)
+            users = list(result.scalars().all())
+
+        if generation == self._cache_generation:
+            self._list_cache.put(key, users)
+        return list(users)
+
+    async def list_notifiable_admins(self, exclude_id: int | None = None) -> list[User]:
+        async with self.database.session() as session:
+            stmt = select(User).where(
+                User.role == UserRole.ADMIN,
+                User.is_active.is_(True),
+                User.telegram_id.is_not(None),
             )
+            if exclude_id is not None:
+                stmt = stmt.where(User.id != exclude_id)
+            result = await session.execute(stmt)
             return list(result.scalars().all())
 
     async def export_users(self, manager_id: int | None = None) -> list[dict]:
@@ -101,7 +173,7 @@ class UserService:
                     User.department,
                     User.line_expiry,
                     User.is_active,
-                    manager_alias.full_name.label("manager_name"),
+                    manager_alias.full_name.label("manager"),
                 )
                 .outerjoin(manager_alias, User.manager_id == manager_alias.id)
             )
@@ -109,22 +181,14 @@ class UserService:
                 stmt = stmt.where(User.manager_id == manager_id)
 
             result = await session.execute(stmt.order_by(User.full_name))
-            rows = result.all()
-            data: list[dict] = []
-            for row in rows:
-                data.append(
-                    {
-                        "id": row.id,
-                        "full_name": row.full_name,
-                        "phone": row.phone,
-                        "role": row.role.value,
-                        "department": row.department.value if row.department else None,
-                        "line_expiry": row.line_expiry,
-                        "is_active": row.is_active,
-                        "manager": row.manager_name,
-                    }
-                )
-            return data
+            return [
+                {
+                    **row,
+                    "role": row["role"].value,
+                    "department": row["department"].value if row["department"] else None,
+                }
+                for row in result.mappings()
+            ]
 
     async def create_user(
         self,
@@ -152,7 +216,7 @@ class UserService:
                 )
                 session.add(user)
                 await session.commit()
-                await session.refresh(user)
+                self._invalidate_caches()
                 logger.log(
                     "User created",
                     user_id=user.id,
@@ -172,14 +236,18 @@ class UserService:
             if user is None:
                 raise NoResultFound(f"User id={user_id} not found")
 
-            for member in list(user.members):
-                member.manager_id = None
+            await session.execute(
+                update(User)
+                .where(User.manager_id == user_id)
+                .values(manager_id=None)
+                .execution_options(synchronize_session=False)
+            )
 
             user.is_active = False
             user.telegram_id = None
 
             await session.commit()
-            await session.refresh(user)
+            self._invalidate_caches()
 
             logger.log(
                 "User deactivated",
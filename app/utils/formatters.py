@@ -1,10 +1,22 @@
 from __future__ import annotations
 
 
+class _PhoneCharTable(dict):
+    """``str.translate`` table keeping digits and ``+``, filled in per code point on first use."""
+
+    def __missing__(self, code: int) -> int | None:
+        char = chr(code)
+        self[code] = kept = code if char.isdigit() or char == "+" else None
+        return kept
+
+
+_PHONE_CHARS = _PhoneCharTable()
+
+
 def normalize_phone(phone: str) -> str:
     """Normalize phone numbers received from Telegram contact payload."""
 
-    digits = "".join(ch for ch in phone if ch.isdigit() or ch == "+")
+    digits = phone if phone.lstrip("+").isdigit() else phone.translate(_PHONE_CHARS)
     if digits.startswith("00"):
         digits = "+" + digits[2:]
     if not digits.startswith("+"):
@@ -1,33 +1,227 @@
-import json
+import asyncio
+import atexit
 import inspect
-from datetime import datetime
+import logging
+import os
+import reprlib
+import struct
+import sys
+import time
+import traceback
+from datetime import date, datetime, timedelta
 from pathlib import Path
 from typing import Any, Dict, Optional, Callable, TypeVar, cast
 from functools import wraps
 
+import orjson
+
 T = TypeVar('T', bound=Callable[..., Any])
 
+# Bounded repr for decorator payloads, so large ORM result lists don't end up in the logs verbatim
+_short_repr = reprlib.Repr()
+_short_repr.maxlist = 5
+_short_repr.maxtuple = 5
+_short_repr.maxdict = 5
+_short_repr.maxstring = 200
+_short_repr.maxother = 200
+
+# Skeleton entries for StructuredLogger.event, copied and filled in per call
+_EVENT_TEMPLATES: Dict[str, Dict[str, Any]] = {
+    event_type: {"event_type": event_type}
+    for event_type in ("authentication", "state_change", "card_operation", "admin_action", "api_call")
+}
+
+
+def _msgpack_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
 class StructuredLogger:
-    def __init__(self, log_dir: str = "logs"):
+    def __init__(self, log_dir: str = "logs", pretty: bool = False, binary: Optional[bool] = None):
         """
         Initialize the structured logger.
         
         Args:
             log_dir: Base directory for storing logs (both logs and errors)
+            pretty: Indent entries for manual inspection instead of one line each
+            binary: Write length-prefixed msgpack records instead of JSON lines;
+                defaults to ``RASID_LOG_FORMAT=binary``. Convert with ``logs_to_json.py``.
         """
         self.base_dir = Path(log_dir)
-        self.current_year = str(datetime.now().year)
-        self.current_month = f"{datetime.now().month:02d}"
-        self._ensure_directories_exist()
+        self._json_options = (
+            orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE
+        )
+        if pretty:
+            self._json_options |= orjson.OPT_INDENT_2
+        if binary is None:
+            binary = os.getenv("RASID_LOG_FORMAT", "json").lower() == "binary"
+        self._packb: Optional[Callable[..., bytes]] = None
+        if binary:
+            # msgpack is optional; without it the logger keeps writing JSON
+            try:
+                import msgpack
+            except ImportError:
+                logging.getLogger(__name__).warning(
+                    "msgpack is not installed, falling back to JSON logs"
+                )
+            else:
+                self._packb = msgpack.packb
+        self._extension = "json" if self._packb is None else "msgpack"
+        # Resolved (and created) by the first _check_date_changed, not at import time
+        self.current_year = ""
+        self.current_month = ""
+        self.current_month_dir = self.base_dir
+        self._log_path = ""
+        self._error_path = ""
+        self._day_end = 0.0
+        # Settings.log_level reads LOG_LEVEL (default INFO); mirror it so processes that
+        # never call setup_logging, such as the report worker, log at the same level
+        self.set_level(os.getenv("LOG_LEVEL", "INFO"))
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._write_queue: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        self._fds: Dict[str, int] = {}
+        atexit.register(self.close)
+
+    # ===== Level & Deferred Emission =====
+
+    def set_level(self, level: int | str) -> None:
+        """Set the minimum level below which entries are dropped."""
+        if isinstance(level, str):
+            resolved = logging.getLevelName(level.upper())
+            if not isinstance(resolved, int):
+                raise ValueError(f"Unknown log level: {level!r}")
+            level = resolved
+        self.level = level
+
+    def isEnabledFor(self, level: int) -> bool:
+        """Mirror ``logging.Logger.isEnabledFor`` so callers can skip building payloads."""
+        return level >= self.level
+
+    def start_background(self) -> None:
+        """
+        Start the background writer task.
+
+        Must be called from a running event loop. Until then ``defer`` emits inline.
+        """
+        if self._writer_task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._write_queue = asyncio.Queue()
+        self._writer_task = self._loop.create_task(self._writer())
+
+    async def stop_background(self) -> None:
+        """Stop the writer task and flush whatever is still queued to disk."""
+        if self._writer_task is None:
+            return
+        # The writer exits once it reaches the sentinel, after everything queued before it
+        self._write_queue.put_nowait(None)
+        await self._writer_task
+        queue, self._loop, self._write_queue, self._writer_task = (
+            self._write_queue, None, None, None
+        )
+        # Deferred calls that ran while the writer was finishing queued behind the sentinel
+        leftovers: Dict[str, list[bytes]] = {}
+        while not queue.empty():
+            log_file, payload = queue.get_nowait()
+            leftovers.setdefault(log_file, []).append(payload)
+        if leftovers:
+            self._write_batch(leftovers)
+
+    def defer(self, method: Callable[..., None], *args: Any, **kwargs: Any) -> None:
+        """Run ``method(*args, **kwargs)`` on a later event loop iteration, off the caller's path."""
+        if self._loop is None:
+            method(*args, **kwargs)
+            return
+        self._loop.call_soon(self._run_deferred, method, args, kwargs)
+
+    @staticmethod
+    def _run_deferred(method: Callable[..., None], args: tuple, kwargs: Dict[str, Any]) -> None:
+        try:
+            method(*args, **kwargs)
+        except Exception as e:
+            print(f"Failed to write log: {e}")
+
+    async def _writer(self, batch_size: int = 256) -> None:
+        """Write queued entries in batches, with one write per target file per batch."""
+        while True:
+            item = await self._write_queue.get()
+            stop = item is None
+            batch: Dict[str, list[bytes]] = {}
+            count = 0
+            while item is not None:
+                log_file, payload = item
+                batch.setdefault(log_file, []).append(payload)
+                count += 1
+                if count >= batch_size or self._write_queue.empty():
+                    break
+                item = self._write_queue.get_nowait()
+                stop = item is None
+            if batch:
+                await asyncio.to_thread(self._write_batch, batch)
+            if stop:
+                return
+
+    def _write_batch(self, batch: Dict[str, list[bytes]]) -> None:
+        for log_file, payloads in batch.items():
+            try:
+                fd = self._fd(log_file)
+                # One write per file per batch; loop only in case the kernel takes part of it
+                data = memoryview(b"".join(payloads))
+                while data:
+                    data = data[os.write(fd, data):]
+            except Exception as e:
+                print(f"Failed to write log: {e}")
+
+    def _fd(self, log_file: str) -> int:
+        """Return the cached append-mode descriptor for ``log_file``, closing those from past months."""
+        fd = self._fds.get(log_file)
+        if fd is None:
+            directory = os.path.dirname(log_file)
+            for stale in [path for path in self._fds if os.path.dirname(path) != directory]:
+                os.close(self._fds.pop(stale))
+            fd = self._fds[log_file] = os.open(
+                log_file, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644
+            )
+        return fd
+
+    def close(self) -> None:
+        """Close all open log files."""
+        while self._fds:
+            _, fd = self._fds.popitem()
+            os.close(fd)
+
+    def _enqueue_write(self, log_file: str, payload: bytes) -> None:
+        """Hand a formatted entry to the writer task, or write it inline when none is running."""
+        if self._write_queue is None:
+            self._write_batch({log_file: [payload]})
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._write_queue.put_nowait((log_file, payload))
+        else:
+            self._loop.call_soon_threadsafe(self._write_queue.put_nowait, (log_file, payload))
 
     def _ensure_directories_exist(self) -> None:
         """Ensure that the required log directories exist."""
         self.current_month_dir = self.base_dir / self.current_year / self.current_month
         self.current_month_dir.mkdir(parents=True, exist_ok=True)
+        self._log_path = str(self.current_month_dir / f"logs.{self._extension}")
+        self._error_path = str(self.current_month_dir / f"errors.{self._extension}")
 
     def _check_date_changed(self) -> None:
         """Check if the date has changed and update directories if needed."""
+        # Only recompute once the local day the cached directory was checked in has passed
+        if time.time() < self._day_end:
+            return
         now = datetime.now()
+        tomorrow = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+        self._day_end = tomorrow.timestamp()
         current_year = str(now.year)
         current_month = f"{now.month:02d}"
         
@@ -37,29 +231,25 @@ class StructuredLogger:
             self._ensure_directories_exist()
 
     def _write_log(self, data: Dict[str, Any], log_type: str = "log") -> None:
-        """Write log entry to the appropriate file with pretty-printed JSON."""
+        """Write log entry to the appropriate file as a JSON line or a msgpack record."""
         try:
             self._check_date_changed()
             
             # Add timestamp if not present
             if "timestamp" not in data:
-                data["timestamp"] = datetime.now().isoformat()
+                data["timestamp"] = datetime.now()
             
-            # Format the JSON with proper indentation
-            formatted_json = json.dumps(
-                data, 
-                ensure_ascii=False, 
-                indent=2, 
-                sort_keys=True,
-                default=str  # Handle datetime serialization
-            )
+            if self._packb is None:
+                # datetimes (including the timestamp) are native to orjson; default=str covers everything else
+                payload = orjson.dumps(data, default=str, option=self._json_options)
+            else:
+                record = self._packb(data, default=_msgpack_default)
+                payload = struct.pack("<I", len(record)) + record
             
-            # Write to appropriate file
-            filename = "logs.json" if log_type == "log" else "errors.json"
-            log_file = self.current_month_dir / filename
+            # Queue for the appropriate file
+            log_file = self._log_path if log_type == "log" else self._error_path
             
-            with open(log_file, "a", encoding="utf-8") as f:
-                f.write(formatted_json + "\n\n")
+            self._enqueue_write(log_file, payload)
                 
         except Exception as e:
             print(f"Failed to write log: {e}")
@@ -68,18 +258,26 @@ class StructuredLogger:
     
     def log(self, message: str, **kwargs: Any) -> None:
         """Log a general message with INFO level."""
+        if self.level > logging.INFO:
+            return
         self._write_log({"level": "INFO", "message": message, **kwargs}, "log")
 
     def debug(self, message: str, **kwargs: Any) -> None:
         """Log a debug message."""
+        if self.level > logging.DEBUG:
+            return
         self._write_log({"level": "DEBUG", "message": message, **kwargs}, "log")
 
     def info(self, message: str, **kwargs: Any) -> None:
         """Log an informational message."""
+        if self.level > logging.INFO:
+            return
         self._write_log({"level": "INFO", "message": message, **kwargs}, "log")
 
     def warning(self, message: str, **kwargs: Any) -> None:
         """Log a warning message."""
+        if self.level > logging.WARNING:
+            return
         self._write_log({"level": "WARNING", "message": message, **kwargs}, "log")
 
     def error(self, message: str, exception: Optional[Exception] = None, **kwargs: Any) -> None:
@@ -104,61 +302,39 @@ class StructuredLogger:
         self._write_log({"level": "CRITICAL", "message": message, **kwargs}, "error")
 
     # ===== Specialized Logging Methods =====
-    
+
+    def event(self, event_type: str, **kwargs: Any) -> None:
+        """Log a structured event of one of the kinds in ``_EVENT_TEMPLATES`` at INFO level."""
+        if self.level > logging.INFO:
+            return
+        data = _EVENT_TEMPLATES[event_type].copy()
+        data.update(kwargs)
+        self._write_log(data, "log")
+
     def log_auth(self, event: str, user_id: int, **kwargs: Any) -> None:
         """Log authentication-related events."""
-        self._write_log({
-            "event_type": "authentication",
-            "event": event,
-            "user_id": user_id,
-            **kwargs
-        }, "log")
+        self.event("authentication", event=event, user_id=user_id, **kwargs)
 
     def log_state_change(self, user_id: int, from_state: str, to_state: str, **kwargs: Any) -> None:
         """Log state machine transitions."""
-        self._write_log({
-            "event_type": "state_change",
-            "user_id": user_id,
-            "from_state": from_state,
-            "to_state": to_state,
-            **kwargs
-        }, "log")
+        self.event("state_change", user_id=user_id, from_state=from_state, to_state=to_state, **kwargs)
 
     def log_card_operation(self, operation: str, card_id: int, user_id: int | None, **kwargs: Any) -> None:
         """Log card-related operations."""
-        self._write_log({
-            "event_type": "card_operation",
-            "operation": operation,
-            "card_id": card_id,
-            "user_id": user_id,
-            **kwargs
-        }, "log")
+        self.event("card_operation", operation=operation, card_id=card_id, user_id=user_id, **kwargs)
 
     def log_admin_action(self, action: str, admin_id: int, target_type: str, **kwargs: Any) -> None:
         """Log administrative actions."""
-        self._write_log({
-            "event_type": "admin_action",
-            "action": action,
-            "admin_id": admin_id,
-            "target_type": target_type,
-            **kwargs
-        }, "log")
+        self.event("admin_action", action=action, admin_id=admin_id, target_type=target_type, **kwargs)
 
     def log_api_call(self, endpoint: str, method: str, status_code: int, **kwargs: Any) -> None:
         """Log API interactions."""
-        self._write_log({
-            "event_type": "api_call",
-            "endpoint": endpoint,
-            "method": method,
-            "status_code": status_code,
-            **kwargs
-        }, "log")
+        self.event("api_call", endpoint=endpoint, method=method, status_code=status_code, **kwargs)
 
     # ===== Helper Methods =====
     
     def _get_traceback(self, exception: Exception) -> str:
         """Get formatted traceback from exception."""
-        import traceback
         return ''.join(traceback.format_exception(type(exception), exception, exception.__traceback__))
     
     def log_exception(self, exception: Exception, context: str = "", **kwargs: Any) -> None:
@@ -176,13 +352,9 @@ class StructuredLogger:
             message += f", please use {alternative} instead"
         
         # Get the caller's information
-        frame = inspect.currentframe().f_back
-        caller_info = ""
-        if frame:
-            try:
-                caller_info = f" at {frame.f_code.co_filename}:{frame.f_lineno}"
-            finally:
-                del frame
+        frame = sys._getframe(1)
+        caller_info = f" at {frame.f_code.co_filename}:{frame.f_lineno}"
+        del frame
         
         self.warning(message, deprecation_notice=True, caller=caller_info, **kwargs)
 
@@ -190,60 +362,72 @@ class StructuredLogger:
     
     def log_function_call(self, func: T) -> T:
         """Decorator to log function calls with arguments and return values."""
-        @wraps(func)
-        async def async_wrapper(*args, **kwargs):
-            func_name = func.__name__
-            try:
-                self.debug(
-                    f"Calling {func_name}",
-                    function=func_name,
-                    args=args,
-                    kwargs=kwargs
-                )
-                result = await func(*args, **kwargs)
-                self.debug(
-                    f"Function {func_name} completed successfully",
-                    function=func_name,
-                    result=result
-                )
-                return result
-            except Exception as e:
-                self.error(
-                    f"Error in {func_name}",
-                    function=func_name,
-                    error=str(e),
-                    exc_info=True
-                )
-                raise
-        
+        func_name = func.__name__
+        debug, error = self.debug, self.error
+
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                # Checked once per call so args/result are never packed when DEBUG is off
+                enabled = self.level <= logging.DEBUG
+                try:
+                    if enabled:
+                        debug(
+                            f"Calling {func_name}",
+                            function=func_name,
+                            args=_short_repr.repr(args),
+                            kwargs=_short_repr.repr(kwargs)
+                        )
+                    result = await func(*args, **kwargs)
+                    if enabled:
+                        debug(
+                            f"Function {func_name} completed successfully",
+                            function=func_name,
+                            result=_short_repr.repr(result)
+                        )
+                    return result
+                except Exception as e:
+                    error(
+                        f"Error in {func_name}",
+                        function=func_name,
+                        error=str(e),
+                        exc_info=True
+                    )
+                    raise
+
+            return cast(T, async_wrapper)
+
         @wraps(func)
         def sync_wrapper(*args, **kwargs):
-            func_name = func.__name__
+            # Checked once per call so args/result are never packed when DEBUG is off
+            enabled = self.level <= logging.DEBUG
             try:
-                self.debug(
-                    f"Calling {func_name}",
-                    function=func_name,
-                    args=args,
-                    kwargs=kwargs
-                )
+                if enabled:
+                    debug(
+                        f"Calling {func_name}",
+                        function=func_name,
+                        args=_short_repr.repr(args),
+                        kwargs=_short_repr.repr(kwargs)
+                    )
                 result = func(*args, **kwargs)
-                self.debug(
-                    f"Function {func_name} completed successfully",
-                    function=func_name,
-                    result=result
-                )
+                if enabled:
+                    debug(
+                        f"Function {func_name} completed successfully",
+                        function=func_name,
+                        result=_short_repr.repr(result)
+                    )
                 return result
             except Exception as e:
-                self.error(
+                error(
                     f"Error in {func_name}",
                     function=func_name,
                     error=str(e),
                     exc_info=True
                 )
                 raise
-        
-        return cast(T, async_wrapper if inspect.iscoroutinefunction(func) else sync_wrapper)
+
+        return cast(T, sync_wrapper)
 
 
-# Create a singleton instance
+# Create a singleton instance; construction touches no files until the first write
 logger = StructuredLogger()
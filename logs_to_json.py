@@ -0,0 +1,50 @@
+"""Convert binary (msgpack) structured logs back to JSON lines.
+
+Usage: python logs_to_json.py logs/2026/10/logs.msgpack > logs.json
+
+Binary logs are opt-in (RASID_LOG_FORMAT=binary), so msgpack is not part of
+requirements.txt; install it wherever binary logs are written or converted.
+"""
+from __future__ import annotations
+
+import struct
+import sys
+from typing import BinaryIO, Iterator
+
+import msgpack
+import orjson
+
+_LENGTH = struct.Struct("<I")
+
+
+def iter_records(stream: BinaryIO) -> Iterator[dict]:
+    """Yield the records of a length-prefixed msgpack log file."""
+    while header := stream.read(_LENGTH.size):
+        if len(header) < _LENGTH.size:
+            raise ValueError("Truncated record header")
+        (size,) = _LENGTH.unpack(header)
+        body = stream.read(size)
+        if len(body) < size:
+            raise ValueError("Truncated record body")
+        yield msgpack.unpackb(body, strict_map_key=False)
+
+
+def main(paths: list[str]) -> None:
+    out = sys.stdout.buffer
+    for path in paths:
+        with open(path, "rb") as stream:
+            for record in iter_records(stream):
+                out.write(
+                    orjson.dumps(
+                        record,
+                        option=orjson.OPT_SORT_KEYS
+                        | orjson.OPT_NON_STR_KEYS
+                        | orjson.OPT_APPEND_NEWLINE,
+                    )
+                )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit(__doc__)
+    main(sys.argv[1:])
@@ -6,33 +6,46 @@ from app import get_settings
 from app.factory import create_bot, create_dispatcher
 from app.handlers import router as root_router
 from app.logging import setup_logging
-from app.jobs.scheduler import setup_scheduler
+from app.jobs.scheduler import create_report_executor, setup_scheduler
 from app.services import build_services
+from app.utils.logger import logger as structured_logger
 
 
 async def main() -> None:
     settings = get_settings()
     setup_logging(level=settings.log_level)
 
-    bot = create_bot(settings)
-    dp = create_dispatcher()
-    services = build_services(settings)
-    setattr(bot, "services", services)
-    dp.workflow_data.update({"services": services})
-
-    scheduler = setup_scheduler(
-        bot=bot,
-        services=services,
-        timezone_name=settings.timezone,
-    )
-    setattr(bot, "scheduler", scheduler)
-
-    dp.include_router(root_router)
-
+    report_executor = None
+    scheduler = None
+    # Everything after setup_logging runs inside the try, so a startup failure
+    # still drains the log writer that setup_logging started.
     try:
-        await dp.start_polling(bot, allowed_updates=dp.resolve_used_update_types())
+        bot = create_bot(settings)
+        dp = create_dispatcher()
+        services = build_services(settings)
+        setattr(bot, "services", services)
+        dp.workflow_data.update({"services": services})
+
+        # pandas/xlsx rendering is CPU bound; keep it off the bot's event loop.
+        report_executor = create_report_executor()
+        scheduler = setup_scheduler(
+            bot=bot,
+            services=services,
+            timezone_name=settings.timezone,
+            report_executor=report_executor,
+        )
+        setattr(bot, "scheduler", scheduler)
+
+        dp.include_router(root_router)
+        allowed_updates = dp.resolve_used_update_types()
+
+        await dp.start_polling(bot, allowed_updates=allowed_updates)
     finally:
-        scheduler.shutdown(wait=False)
+        if scheduler is not None:
+            scheduler.shutdown(wait=False)
+        if report_executor is not None:
+            report_executor.shutdown(wait=False, cancel_futures=True)
+        await structured_logger.stop_background()
 
 
 if __name__ == "__main__":